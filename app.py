@@ -1,17 +1,45 @@
 import sys
 import cv2
 import os
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton,
     QFileDialog, QSlider, QVBoxLayout, QHBoxLayout,
     QCheckBox, QGroupBox, QMessageBox, QScrollArea,
-    QSizePolicy
+    QSizePolicy, QComboBox
 )
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QImage, QPixmap, QFont
+from PyQt5.QtCore import QTimer, Qt, QEvent, QMutex, QMutexLocker
+from PyQt5.QtGui import QImage, QPixmap, QFont, QGuiApplication
 
-from nodes import FeedbackNode, GlowNode, RGBSplitNode, ObjectTrackingNode, BlobTrackingNode
+# Kernels launch from the processing and warm-up threads, and the TBB
+# layer can hang at interpreter exit after that, so prefer OpenMP unless
+# the environment already picks an order
+os.environ.setdefault("NUMBA_THREADING_LAYER_PRIORITY", "omp tbb workqueue")
+
+from nodes import (
+    FeedbackNode, GlowNode, RGBSplitNode, FusedFeedbackGlowRGBNode,
+    ObjectTrackingNode, BlobTrackingNode, HAS_CUDA
+)
 from engine import VisualEngine
+from workers import CaptureThread, ProcessThread, WriterThread, CudaVideoWriter
+
+# FFmpeg capture options for each hardware decoder
+HW_DECODERS = {
+    "CUDA (cuvid)": "hwaccel;cuvid|video_codec;h264_cuvid|vsync;0",
+    "VAAPI": "hwaccel;vaapi|vsync;0",
+}
+
+# RAM budget for decoded frames replayed on restart
+HEAD_CACHE_BYTES = 256 * 1024 * 1024
+
+# FFmpeg H.264 hardware encoders to try when recording
+HW_ENCODERS = ("h264_nvenc", "h264_qsv")
+
+# Capture params asking OpenCV for any hardware decoder, empty on old builds
+HW_ACCELERATION = (
+    [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    if hasattr(cv2, 'VIDEO_ACCELERATION_ANY') else []
+)
 
 
 class VisualApp(QWidget):
@@ -21,6 +49,14 @@ class VisualApp(QWidget):
         self.resize(1200, 700)
 
         self.cap = None
+        self.capture = None
+        self.processor = None
+        self.capture_buffered = False
+        # Decoded frames from the start of the video, see find_head_keyframe()
+        self.head_frames = []
+        self.head_end = 0
+        # Held while the engine runs on the processing thread
+        self.engine_lock = QMutex()
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_frame)
         
@@ -31,28 +67,47 @@ class VisualApp(QWidget):
         self.fps = 30
         self.frame_width = 0
         self.frame_height = 0
+        
+        # Persistent display buffers, reallocated only on resolution change
+        self._scaled_buf = None
+        self._bgra_buf = None
+        self._qimage = None
+        self._label_size = (800, 600)
+        # (frame size, target size, interpolation), recomputed on resize
+        self._target = None
+
+        # Cap OpenCV's internal thread pool so node kernels don't oversubscribe
+        # the cores shared with the GUI. OMP_NUM_THREADS is not enough because
+        # OpenCV may be built against TBB or pthreads instead of OpenMP.
+        default_threads = max(2, (os.cpu_count() or 2) // 2)
+        try:
+            self.cv_threads = int(os.environ.get("TOUCHVISUAL_CV_THREADS", default_threads))
+        except ValueError:
+            print("TOUCHVISUAL_CV_THREADS is not an integer, using the default.")
+            self.cv_threads = default_threads
+        cv2.setNumThreads(self.cv_threads)
+        cv2.setUseOptimized(True)
 
         # Nodes
         self.feedback = FeedbackNode(0.9)
         self.glow = GlowNode(1.5)
         self.rgb = RGBSplitNode(10)
+        self.fused = FusedFeedbackGlowRGBNode(self.feedback, self.glow, self.rgb)
+        # Run the effect stack on the GPU when OpenCV has a CUDA device
+        self.use_cuda = HAS_CUDA
         self.object_tracking = ObjectTrackingNode(show_trail=True, trail_length=20)
         self.blob_tracking = BlobTrackingNode(min_area=100, max_area=50000)
         
         # Effect states
-        self.effects_enabled = {
-            'feedback': True,
-            'glow': True,
-            'rgb_split': True,
-            'object_tracking': False,
-            'blob_tracking': False
-        }
-
-        self.engine = VisualEngine([
-            self.feedback,
-            self.glow,
-            self.rgb
-        ])
+        self.object_tracking.enabled = False
+        self.blob_tracking.enabled = False
+
+        # One persistent engine over every node, toggles only flip node.enabled
+        self.engine = VisualEngine(
+            [self.feedback, self.glow, self.rgb,
+             self.object_tracking, self.blob_tracking],
+            use_cuda=self.use_cuda, fused=[self.fused]
+        )
 
         self.apply_dark_theme()
         self.init_ui()
@@ -140,6 +195,19 @@ class VisualApp(QWidget):
             QScrollArea {
                 border: none;
             }
+            QComboBox {
+                background-color: #2d2d2d;
+                border: 1px solid #555;
+                border-radius: 4px;
+                padding: 3px 8px;
+            }
+            QComboBox:hover {
+                border-color: #32cd32;
+            }
+            QComboBox QAbstractItemView {
+                background-color: #2d2d2d;
+                selection-background-color: #800020;
+            }
         """)
 
     def create_slider_with_label(self, label_text, min_val, max_val, default_val, callback):
@@ -162,10 +230,18 @@ class VisualApp(QWidget):
         value_label.setMaximumWidth(45)
         value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         
-        # Update value label and call callback when slider changes
+        # Update the value label right away, but throttle a drag to one
+        # callback per ~frame with the latest value. The timer is not
+        # restarted while pending, so a continuous drag still updates live.
+        throttle = QTimer(slider)
+        throttle.setSingleShot(True)
+        throttle.setInterval(16)
+        throttle.timeout.connect(lambda: callback(slider.value()))
+
         def update_label_and_callback(val):
             value_label.setText(str(val))
-            callback(val)
+            if not throttle.isActive():
+                throttle.start()
         slider.valueChanged.connect(update_label_and_callback)
         
         container.addWidget(value_label)
@@ -191,6 +267,38 @@ class VisualApp(QWidget):
         self.load_btn = QPushButton("📁 Load Video")
         self.load_btn.clicked.connect(self.load_video)
         file_layout.addWidget(self.load_btn)
+        
+        # Decoder thread count
+        threads_layout = QHBoxLayout()
+        threads_label = QLabel("Decode Threads:")
+        threads_layout.addWidget(threads_label)
+        self.decode_threads_combo = QComboBox()
+        cpu_count = os.cpu_count() or 1
+        self.decode_threads_combo.addItem(f"Auto ({cpu_count})", cpu_count)
+        for n in (1, 2, 4, 8, 16):
+            if n < cpu_count:
+                self.decode_threads_combo.addItem(str(n), n)
+        threads_layout.addWidget(self.decode_threads_combo)
+        file_layout.addLayout(threads_layout)
+        
+        # Hardware decoding
+        decoder_layout = QHBoxLayout()
+        decoder_label = QLabel("Decoder:")
+        decoder_layout.addWidget(decoder_label)
+        self.decoder_combo = QComboBox()
+        self.decoder_combo.addItem("Auto", None)
+        if HAS_CUDA:
+            self.decoder_combo.addItem("CUDA (cuvid)", HW_DECODERS["CUDA (cuvid)"])
+        if sys.platform.startswith('linux') and os.path.exists('/dev/dri'):
+            self.decoder_combo.addItem("VAAPI", HW_DECODERS["VAAPI"])
+        decoder_layout.addWidget(self.decoder_combo)
+        file_layout.addLayout(decoder_layout)
+        
+        # Low latency (drop late frames) or no-drop playback
+        self.buffered_check = QCheckBox("Show Every Frame")
+        self.buffered_check.setChecked(self.capture_buffered)
+        self.buffered_check.stateChanged.connect(self.toggle_buffered)
+        file_layout.addWidget(self.buffered_check)
         file_group.setLayout(file_layout)
         control_panel.addWidget(file_group)
         
@@ -225,6 +333,13 @@ class VisualApp(QWidget):
         self.blob_tracking_check.stateChanged.connect(self.toggle_blob_tracking)
         effects_layout.addWidget(self.blob_tracking_check)
         
+        # Round blobs (touch points) found by a Hough transform on the GPU
+        self.blob_circles_check = QCheckBox("Blob Circles (GPU)")
+        self.blob_circles_check.setChecked(False)
+        self.blob_circles_check.setEnabled(HAS_CUDA)
+        self.blob_circles_check.stateChanged.connect(self.toggle_blob_circles)
+        effects_layout.addWidget(self.blob_circles_check)
+        
         effects_group.setLayout(effects_layout)
         control_panel.addWidget(effects_group)
         
@@ -269,6 +384,13 @@ class VisualApp(QWidget):
         )
         params_container.addLayout(blob_max_slider_layout)
         
+        # OpenCV thread pool size
+        cv_threads_slider_layout, self.cv_threads_slider = self.create_slider_with_label(
+            "CV Threads:", 1, max(os.cpu_count() or 1, self.cv_threads), self.cv_threads,
+            self.update_cv_threads
+        )
+        params_container.addLayout(cv_threads_slider_layout)
+        
         # Create scrollable area for parameters
         scroll_widget = QWidget()
         scroll_widget.setLayout(params_container)
@@ -343,6 +465,7 @@ class VisualApp(QWidget):
                 border-radius: 5px;
             }
         """)
+        self.video_label.installEventFilter(self)
         video_panel.addWidget(self.video_label)
         
         # Status label
@@ -361,75 +484,176 @@ class VisualApp(QWidget):
             self, "Open Video", "", "Video Files (*.mp4 *.avi *.mov *.mkv *.wmv);;All Files (*)"
         )
         if path:
-            self.cap = cv2.VideoCapture(path)
+            # Also stops the display timer, which would poll the torn down pipeline
+            self.stop()
+            self.cap = self.open_capture(path)
             if self.cap.isOpened():
                 self.fps = int(self.cap.get(cv2.CAP_PROP_FPS))
                 self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                 self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                self.head_frames = []
+                self.head_end = self.find_head_keyframe(path)
+                # The pipeline is stopped, no lock needed
+                self.blob_tracking.reset_background()
+                # Compile kernels for this size before the first frame arrives
+                self.engine.warm_up(self.frame_height, self.frame_width)
                 self.status_label.setText(f"Video loaded: {os.path.basename(path)}")
                 self.start_btn.setEnabled(True)
                 self.save_btn.setEnabled(True)
             else:
                 QMessageBox.warning(self, "Error", "Failed to open video file")
 
+    def open_capture(self, path):
+        """Open a video with multi-threaded or hardware FFmpeg decoding"""
+        threads = self.decode_threads_combo.currentData()
+        hw_options = self.decoder_combo.currentData()
+        options = f"threads;{threads}"
+        # Read by the FFmpeg backend when the capture is opened
+        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = (
+            f"{options}|{hw_options}" if hw_options else options
+        )
+        if hw_options or not HW_ACCELERATION:
+            # Builds without the acceleration constants lack the params overload too
+            cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        else:
+            # Let OpenCV pick NVDEC / VAAPI / D3D11 itself, it decodes in
+            # software when none of them handle the stream
+            cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, HW_ACCELERATION)
+        if not cap.isOpened():
+            # Hardware decoder rejected the stream, retry in software
+            os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = options
+            cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        if not cap.isOpened():
+            # FFmpeg backend unavailable, let OpenCV pick one
+            cap = cv2.VideoCapture(path)
+        if hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            cap.set(cv2.CAP_PROP_N_THREADS, threads)
+        return cap
+
+    def find_head_keyframe(self, path):
+        """Last keyframe index whose leading frames fit in the head cache"""
+        if not hasattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME'):
+            # OpenCV 3.x / older 4.x can't flag keyframes, so no head cache
+            return 0
+        frame_bytes = self.frame_width * self.frame_height * 3
+        max_frames = HEAD_CACHE_BYTES // frame_bytes if frame_bytes else 0
+        # Raw mode only demuxes packets, nothing gets decoded
+        try:
+            raw = cv2.VideoCapture(path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])
+        except TypeError:
+            # No params overload on this build
+            return 0
+        head_end = 0
+        try:
+            if raw.isOpened() and raw.grab():
+                index = 1
+                while index <= max_frames and raw.grab():
+                    if raw.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                        head_end = index
+                    index += 1
+        finally:
+            raw.release()
+        return head_end
+
     def start(self):
         if self.cap:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Reset to beginning
-            self.timer.start(1000 // self.fps if self.fps > 0 else 30)
+            self.stop_pipeline()
+            if self.blob_tracking.enabled and self.head_frames:
+                # Train MOG2 on the cached head up front, so the replay starts
+                # from a settled model instead of one fitted to the video's end
+                self.blob_tracking.reset_background()
+                self.blob_tracking.seed_background(self.head_frames)
+            
+            # Decode -> process -> display pipeline, restarting from the beginning
+            buffered = self.capture_buffered or self.is_recording
+            self.capture = CaptureThread(self.cap, self.fps, buffered=buffered,
+                                         head=self.head_frames, head_end=self.head_end)
+            self.processor = ProcessThread(
+                self.capture.frames, self.engine, self.engine_lock, buffered=buffered
+            )
+            self.processor.writer = self.video_writer
+            self.capture.start()
+            self.processor.start()
+            self.timer.start(self.display_interval())
             self.start_btn.setEnabled(False)
             self.stop_btn.setEnabled(True)
             self.status_label.setText("Playing...")
 
     def stop(self):
         self.timer.stop()
+        self.stop_pipeline()
         if self.is_recording:
             self.stop_recording()
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.status_label.setText("Stopped")
 
+    def stop_pipeline(self):
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+        if self.processor:
+            self.processor.stop()
+            self.processor = None
+
+    def toggle_buffered(self, state):
+        self.capture_buffered = (state == Qt.Checked)
+        self.update_buffering()
+
+    def update_buffering(self):
+        """Never drop frames while recording"""
+        if self.capture and self.processor:
+            buffered = self.capture_buffered or self.is_recording
+            self.capture.frames.set_buffered(buffered)
+            self.processor.output.set_buffered(buffered)
+        if self.timer.isActive():
+            self.timer.setInterval(self.display_interval())
+
+    def display_interval(self):
+        """Display timer period in ms"""
+        if self.capture_buffered or self.is_recording:
+            # Every frame gets shown, so keep the source cadence
+            return int(1000 / self.fps) if self.fps > 0 else 33
+        # Otherwise only the latest frame is painted, once per screen refresh
+        screen = QGuiApplication.primaryScreen()
+        refresh = screen.refreshRate() if screen else 60
+        return max(1, int(1000 / (refresh if refresh > 0 else 60)))
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.stop_pipeline()
+        if self.is_recording:
+            self.stop_recording()
+        super().closeEvent(event)
+
     def toggle_feedback(self, state):
-        self.effects_enabled['feedback'] = (state == Qt.Checked)
-        self.update_engine()
+        self.feedback.enabled = (state == Qt.Checked)
 
     def toggle_glow(self, state):
-        self.effects_enabled['glow'] = (state == Qt.Checked)
-        self.update_engine()
+        self.glow.enabled = (state == Qt.Checked)
 
     def toggle_rgb(self, state):
-        self.effects_enabled['rgb_split'] = (state == Qt.Checked)
-        self.update_engine()
+        self.rgb.enabled = (state == Qt.Checked)
     
     def toggle_object_tracking(self, state):
-        self.effects_enabled['object_tracking'] = (state == Qt.Checked)
+        self.object_tracking.enabled = (state == Qt.Checked)
         if state == Qt.Unchecked:
             # Reset tracker when disabled
-            self.object_tracking.tracker_initialized = False
-            self.object_tracking.tracker = None
-            self.object_tracking.trail_points = []
-        self.update_engine()
+            with QMutexLocker(self.engine_lock):
+                self.object_tracking.tracker_initialized = False
+                self.object_tracking.tracker = None
+                self.object_tracking.clear_trail()
     
     def toggle_blob_tracking(self, state):
-        self.effects_enabled['blob_tracking'] = (state == Qt.Checked)
+        self.blob_tracking.enabled = (state == Qt.Checked)
         if state == Qt.Unchecked:
             # Reset background subtractor when disabled
-            self.blob_tracking.bg_subtractor = None
-        self.update_engine()
-
-    def update_engine(self):
-        """Rebuild engine with only enabled effects"""
-        nodes = []
-        if self.effects_enabled['feedback']:
-            nodes.append(self.feedback)
-        if self.effects_enabled['glow']:
-            nodes.append(self.glow)
-        if self.effects_enabled['rgb_split']:
-            nodes.append(self.rgb)
-        if self.effects_enabled['object_tracking']:
-            nodes.append(self.object_tracking)
-        if self.effects_enabled['blob_tracking']:
-            nodes.append(self.blob_tracking)
-        self.engine = VisualEngine(nodes)
+            with QMutexLocker(self.engine_lock):
+                self.blob_tracking.reset_background()
+
+    def toggle_blob_circles(self, state):
+        # Switching rebuilds the mask pipeline on the next frame
+        self.blob_tracking.gpu_circles = (state == Qt.Checked)
 
     def update_feedback(self, value):
         self.feedback.decay = value / 100.0
@@ -448,6 +672,10 @@ class VisualApp(QWidget):
     
     def update_blob_max(self, value):
         self.blob_tracking.max_area = value
+    
+    def update_cv_threads(self, value):
+        self.cv_threads = value
+        cv2.setNumThreads(value)
 
     def toggle_recording(self):
         if not self.is_recording:
@@ -455,6 +683,42 @@ class VisualApp(QWidget):
         else:
             self.stop_recording()
 
+    def open_writer(self, path):
+        """Open a video writer, preferring hardware H.264 encoders"""
+        size = (self.frame_width, self.frame_height)
+        if HAS_CUDA and hasattr(cv2, 'cudacodec'):
+            try:
+                return CudaVideoWriter(path, size, self.fps)
+            except (AttributeError, cv2.error):
+                pass
+
+        # NVENC / QSV through FFmpeg when the OpenCV build has them
+        fourcc = cv2.VideoWriter_fourcc(*'avc1')
+        previous = os.environ.get("OPENCV_FFMPEG_WRITER_OPTIONS")
+        try:
+            for codec in HW_ENCODERS:
+                os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = f"video_codec;{codec}"
+                writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, fourcc, self.fps, size)
+                if writer.isOpened():
+                    return writer
+        finally:
+            # Only read while a writer is opened, so don't leak it to later ones
+            if previous is None:
+                os.environ.pop("OPENCV_FFMPEG_WRITER_OPTIONS", None)
+            else:
+                os.environ["OPENCV_FFMPEG_WRITER_OPTIONS"] = previous
+
+        # Any other hardware H.264 encoder OpenCV knows about (VAAPI, MFX)
+        if HW_ACCELERATION:
+            params = [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, HW_ACCELERATION[1]]
+            writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, fourcc, self.fps, size, params)
+            if writer.isOpened():
+                return writer
+
+        # Software mpeg4 always works
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        return cv2.VideoWriter(path, fourcc, self.fps, size)
+
     def start_recording(self):
         if not self.cap:
             return
@@ -463,12 +727,16 @@ class VisualApp(QWidget):
             self, "Save Video", "", "MP4 Files (*.mp4);;AVI Files (*.avi);;All Files (*)"
         )
         if path:
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            self.video_writer = cv2.VideoWriter(
-                path, fourcc, self.fps, (self.frame_width, self.frame_height)
-            )
-            if self.video_writer.isOpened():
+            writer = self.open_writer(path)
+            if writer.isOpened():
+                # Encode on a separate thread so it doesn't stall processing
+                self.video_writer = WriterThread(writer)
+                self.video_writer.start()
+                if self.processor:
+                    with QMutexLocker(self.engine_lock):
+                        self.processor.writer = self.video_writer
                 self.is_recording = True
+                self.update_buffering()
                 self.output_path = path
                 self.save_btn.setText("⏹ Stop Recording")
                 self.save_btn.setStyleSheet("""
@@ -484,20 +752,52 @@ class VisualApp(QWidget):
                 QMessageBox.warning(self, "Error", "Failed to initialize video writer")
 
     def stop_recording(self):
+        if self.processor:
+            with QMutexLocker(self.engine_lock):
+                self.processor.writer = None
         if self.video_writer:
-            self.video_writer.release()
+            self.video_writer.stop()
             self.video_writer = None
         self.is_recording = False
+        self.update_buffering()
         self.save_btn.setText("💾 Save Output")
         self.save_btn.setStyleSheet("")  # Reset to default style
         if self.output_path:
             self.status_label.setText(f"Saved: {os.path.basename(self.output_path)}")
             self.output_path = None
 
+    def eventFilter(self, obj, event):
+        if obj is self.video_label and event.type() == QEvent.Resize:
+            # Cache the label size instead of querying it every frame
+            self._label_size = (event.size().width(), event.size().height())
+            self._target = None
+        return super().eventFilter(obj, event)
+
+    def update_target_size(self, width, height):
+        """Fit a width x height frame to the label, keeping its aspect ratio"""
+        label_w, label_h = self._label_size
+        scale = min(label_w / width, label_h / height)
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        self._target = ((width, height), target, interpolation)
+
+    def allocate_display_buffers(self, width, height):
+        """Allocate display-sized buffers and the QImage that wraps them"""
+        self._scaled_buf = np.empty((height, width, 3), np.uint8)
+        # BGRA bytes are Format_RGB32 on little-endian, the format QPixmap
+        # stores natively, so fromImage() has nothing left to convert.
+        # Wrapping the BGR frame as Format_BGR888 skips the cvtColor, but
+        # fromImage() then converts it on a slower path than cvtColor + RGB32.
+        self._bgra_buf = np.empty((height, width, 4), np.uint8)
+        self._qimage = QImage(self._bgra_buf.data, width, height, 4 * width, QImage.Format_RGB32)
+
     def update_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        processed_frame = self.processor.output.get()
+        if processed_frame is None:
+            if not self.processor.output.is_drained():
+                return  # Next frame is still being decoded or processed
             self.timer.stop()
+            self.stop_pipeline()
             if self.is_recording:
                 self.stop_recording()
             self.start_btn.setEnabled(True)
@@ -505,25 +805,20 @@ class VisualApp(QWidget):
             self.status_label.setText("Video ended")
             return
 
-        # Process frame through engine
-        processed_frame = self.engine.process(frame)
-        
-        # Save frame if recording
-        if self.is_recording and self.video_writer:
-            self.video_writer.write(processed_frame)
-        
-        # Convert for display
-        display_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = display_frame.shape
-        bytes_per_line = ch * w
-        img = QImage(display_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        
         # Scale to fit label while maintaining aspect ratio
-        pixmap = QPixmap.fromImage(img)
-        scaled_pixmap = pixmap.scaled(
-            self.video_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
-        self.video_label.setPixmap(scaled_pixmap)
+        h, w = processed_frame.shape[:2]
+        if self._target is None or self._target[0] != (w, h):
+            self.update_target_size(w, h)
+        _, (target_w, target_h), interpolation = self._target
+        if self._bgra_buf is None or self._bgra_buf.shape[:2] != (target_h, target_w):
+            self.allocate_display_buffers(target_w, target_h)
+        cv2.resize(processed_frame, (target_w, target_h), dst=self._scaled_buf,
+                   interpolation=interpolation)
+        self.processor.output.release(processed_frame)
+        
+        # Pad to BGRA in the persistent buffer the QImage wraps
+        cv2.cvtColor(self._scaled_buf, cv2.COLOR_BGR2BGRA, dst=self._bgra_buf)
+        self.video_label.setPixmap(QPixmap.fromImage(self._qimage))
 
 
 if __name__ == "__main__":
@@ -1,8 +1,174 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+_executor = None
+
+
+def _get_executor():
+    """Shared worker pool, outlives any single engine"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _executor
+
+
 class VisualEngine:
-    def __init__(self, nodes):
+    # Smallest band worth handing to a worker thread
+    MIN_BAND_ROWS = 64
+
+    def __init__(self, nodes, workers=None, use_cuda=False, fused=()):
         self.nodes = nodes
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.use_cuda = use_cuda
+        # Fused nodes are CPU kernels, the CUDA path runs the parts itself
+        self.fused = [] if use_cuda else [f for f in fused if f.available]
+        # (nodes, stages) per enabled-node bitmask, built on first use
+        self.plans = {}
+        # Upload target reused every frame, device memory is allocated once
+        self._gpu_in = cv2.cuda_GpuMat() if use_cuda else None
+        # Background warm_up() still running, if any
+        self._warm_up_thread = None
+
+    def warm_up(self, height, width):
+        """Compile size-specialized kernels in the background
+
+        Numba's workqueue threading layer aborts when parallel kernels are
+        launched from two threads at once, so process() and any later
+        warm_up() wait for this one to finish.
+        """
+        nodes = list(self.nodes) + self.fused
+        previous = self._warm_up_thread
+
+        def run():
+            if previous is not None:
+                previous.join()
+            for node in nodes:
+                node.warm_up(height, width)
+
+        self._warm_up_thread = threading.Thread(target=run, daemon=True)
+        self._warm_up_thread.start()
+
+    def wait_warm_up(self):
+        """Block until a background warm_up() has finished"""
+        thread = self._warm_up_thread
+        if thread is not None:
+            thread.join()
+            self._warm_up_thread = None
+
+    def enabled_mask(self):
+        mask = 0
+        for i, node in enumerate(self.nodes):
+            if node.enabled:
+                mask |= 1 << i
+        return mask
+
+    def _build_plan(self, mask):
+        """Pick the enabled nodes for mask and swap in fused kernels"""
+        nodes = [node for i, node in enumerate(self.nodes) if mask >> i & 1]
+        for fused in self.fused:
+            parts = list(fused.nodes)
+            for i in range(len(nodes) - len(parts) + 1):
+                if nodes[i:i + len(parts)] == parts:
+                    nodes[i:i + len(parts)] = [fused]
+                    break
+        stages = self._build_stages(nodes)
+        # Last stage that needs a fresh buffer, in-place nodes after it draw on out
+        target = -1
+        for i, (parallel, chain) in enumerate(stages):
+            if parallel or not chain[0].in_place:
+                target = i
+
+        # Resolve each stage to a (run, in_place, to_out) step up front, so
+        # process() only calls straight through the list
+        steps = []
+        for i, (parallel, chain) in enumerate(stages):
+            if parallel:
+                def run(frame, out, chain=chain):
+                    return self._process_bands(chain, frame)
+                steps.append((run, False, False))
+            else:
+                steps.append((chain[0].process, chain[0].in_place, i >= target))
+        return nodes, steps
+
+    def _build_stages(self, nodes):
+        """Collapse consecutive row-parallel nodes into (parallel, chain) stages"""
+        stages = []
+        for node in nodes:
+            if node.row_parallel and stages and stages[-1][0]:
+                stages[-1][1].append(node)
+            else:
+                stages.append((node.row_parallel, [node]))
+        return stages
+
+    def process(self, frame, out=None):
+        """Run the enabled nodes, the result lands in out when one is given"""
+        if self._warm_up_thread is not None:
+            self.wait_warm_up()
+        mask = self.enabled_mask()
+        if not mask:
+            # Nothing enabled, the frame passes straight through
+            return frame if out is None else self._copy_to(out, frame)
+        plan = self.plans.get(mask)
+        if plan is None:
+            plan = self.plans[mask] = self._build_plan(mask)
+        nodes, steps = plan
+
+        if self.use_cuda:
+            frame = self._process_cuda(nodes, frame, out)
+        else:
+            source = frame
+            for run, in_place, to_out in steps:
+                if in_place and frame is not source:
+                    # frame is out or a node's own buffer, safe to draw on
+                    frame = run(frame, frame)
+                else:
+                    # From the target stage on, results go straight into out
+                    frame = run(frame, out if to_out else None)
+        return frame if out is None else self._copy_to(out, frame)
+
+    @staticmethod
+    def _copy_to(out, frame):
+        if frame is not out:
+            np.copyto(out, frame)
+        return out
+
+    def _process_bands(self, chain, frame):
+        """Run a chain of pointwise nodes over horizontal bands in parallel"""
+        for node in chain:
+            node.prepare(frame)
+
+        def run_band(rows):
+            src = frame
+            for node in chain:
+                src = node.process_rows(src, rows)
+            return src
+
+        h = frame.shape[0]
+        n = min(self.workers, max(1, h // self.MIN_BAND_ROWS))
+        if n == 1:
+            return run_band(slice(None))
+        bounds = [h * i // n for i in range(n + 1)]
+        bands = [slice(bounds[i], bounds[i + 1]) for i in range(n)]
+        return list(_get_executor().map(run_band, bands))[0]
 
-    def process(self, frame):
-        for node in self.nodes:
-            frame = node.process(frame)
+    def _process_cuda(self, nodes, frame, out=None):
+        """Keep frames on the GPU between CUDA-capable nodes"""
+        # frame may already be a GpuMat, e.g. from a hardware decoder
+        for node in nodes:
+            if node.supports_cuda:
+                if isinstance(frame, np.ndarray):
+                    self._gpu_in.upload(frame)
+                    frame = self._gpu_in
+                frame = node.process_cuda(frame)
+            else:
+                if not isinstance(frame, np.ndarray):
+                    frame = frame.download()
+                frame = node.process(frame)
+        if not isinstance(frame, np.ndarray):
+            # Straight into the caller's buffer when there is one
+            frame = frame.download() if out is None else frame.download(dst=out)
         return frame
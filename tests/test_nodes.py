@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+from nodes import BlobTrackingNode
+
+
+class DrawCirclesTest(unittest.TestCase):
+    """draw_circles() runs on the CPU, only touch_points() needs CUDA"""
+
+    def setUp(self):
+        self.node = BlobTrackingNode(show_contours=False, show_centroids=True,
+                                     color=(255, 255, 255))
+        self.node.detect_scale = 2
+        self.frame = np.zeros((120, 160, 3), np.uint8)
+
+    def test_no_circles_returns_input(self):
+        circles = np.empty((0, 3), np.float32)
+        self.assertIs(self.node.draw_circles(self.frame, circles), self.frame)
+
+    def test_circles_scaled_to_full_resolution(self):
+        # (x, y, radius) at detect_size(), rounds to (21, 41) r=10 at full size
+        circles = np.array([[10.3, 20.4, 5.0]], np.float32)
+        result = self.node.draw_circles(self.frame, circles)
+        self.assertIsNot(result, self.frame)
+        self.assertFalse(self.frame.any())
+
+        # Centroid dot at the scaled center
+        np.testing.assert_array_equal(result[41, 21], (255, 255, 255))
+        # Bounding box from (11, 31) to (31, 51)
+        np.testing.assert_array_equal(result[31, 11:32], 255)
+        np.testing.assert_array_equal(result[51, 11:32], 255)
+        np.testing.assert_array_equal(result[31:52, 11], 255)
+        np.testing.assert_array_equal(result[31:52, 31], 255)
+        # Nothing drawn past the box, the area label sits above it
+        self.assertFalse(result[53:, :].any())
+        self.assertFalse(result[26:, 33:].any())
+
+    def test_draws_into_out(self):
+        circles = np.array([[10.0, 20.0, 5.0]], np.float32)
+        out = np.empty_like(self.frame)
+        self.assertIs(self.node.draw_circles(self.frame, circles, out), out)
+
+
+if __name__ == '__main__':
+    unittest.main()
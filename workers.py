@@ -0,0 +1,428 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QThread, QMutex, QMutexLocker, QWaitCondition
+
+
+# =========================
+# Frame Buffer
+# =========================
+class FrameBuffer:
+    """Small bounded frame queue shared between two threads"""
+
+    def __init__(self, size=2, buffered=False):
+        # buffered=False: low latency, older frames are dropped
+        # buffered=True: no-drop, put() blocks while the buffer is full
+        self.buffered = buffered
+        self.frames = deque(maxlen=size)
+        self.closed = False
+        self.mutex = QMutex()
+        self.not_empty = QWaitCondition()
+        self.not_full = QWaitCondition()
+
+    def put(self, frame):
+        """Queue a frame, returns False once the buffer has been closed"""
+        with QMutexLocker(self.mutex):
+            while (self.buffered and not self.closed
+                   and len(self.frames) == self.frames.maxlen):
+                self.not_full.wait(self.mutex)
+            if self.closed:
+                return False
+            self.frames.append(frame)
+            self.not_empty.wakeAll()
+            return True
+
+    def get(self, timeout=0):
+        """Pop the next frame, or None if nothing arrived within timeout ms"""
+        with QMutexLocker(self.mutex):
+            if timeout and not self.frames and not self.closed:
+                self.not_empty.wait(self.mutex, timeout)
+            if not self.frames:
+                return None
+            if self.buffered:
+                frame = self.frames.popleft()
+                self.not_full.wakeAll()
+            else:
+                # Only the most recent frame matters, drop the rest
+                frame = self.frames.pop()
+                self.frames.clear()
+            return frame
+
+    def set_buffered(self, buffered):
+        with QMutexLocker(self.mutex):
+            self.buffered = buffered
+            self.not_full.wakeAll()
+
+    def close(self):
+        """Stop accepting frames and wake up any waiting thread"""
+        with QMutexLocker(self.mutex):
+            self.closed = True
+            self.not_empty.wakeAll()
+            self.not_full.wakeAll()
+
+    def is_drained(self):
+        with QMutexLocker(self.mutex):
+            return self.closed and not self.frames
+
+
+# =========================
+# Latest Frame Slot
+# =========================
+class LatestSlot:
+    """Single-slot frame hand-off from one producer to one polling consumer"""
+    __slots__ = ('buffered', 'closed', '_slot', '_free', '_taken')
+
+    def __init__(self, pool_size=3, buffered=False):
+        # buffered=False: publish() replaces an unread frame, no locks involved
+        # buffered=True: publish() waits for the consumer to take the last frame
+        self.buffered = buffered
+        self.closed = False
+        # deque append/pop are atomic, which is all a single producer and
+        # a single consumer need
+        self._slot = deque(maxlen=1)
+        # Frame copies recycled between producer and consumer
+        self._free = deque(maxlen=pool_size)
+        self._taken = threading.Event()
+
+    def acquire(self, shape, dtype=np.uint8):
+        """Pooled buffer for the producer to fill, None once closed"""
+        if self.closed:
+            return None
+
+        try:
+            buf = self._free.pop()
+        except IndexError:
+            buf = None
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+        return buf
+
+    def publish(self, buf):
+        """Make buf, filled after acquire(), the latest frame"""
+        while True:
+            self._taken.clear()
+            if not (self.buffered and self._slot and not self.closed):
+                break
+            self._taken.wait()
+        if self.closed:
+            return False
+        try:
+            # Unread frame is replaced, its buffer goes back to the pool
+            self._free.append(self._slot.pop())
+        except IndexError:
+            pass
+        self._slot.append(buf)
+        return True
+
+    def get(self):
+        """Take the latest frame, or None if nothing new was published"""
+        try:
+            buf = self._slot.pop()
+        except IndexError:
+            return None
+        self._taken.set()
+        return buf
+
+    def release(self, buf):
+        """Return a frame from get() once the consumer is done with it"""
+        self._free.append(buf)
+
+    def set_buffered(self, buffered):
+        self.buffered = buffered
+        self._taken.set()
+
+    def close(self):
+        self.closed = True
+        self._taken.set()
+
+    def is_drained(self):
+        return self.closed and not self._slot
+
+
+# =========================
+# Capture Thread
+# =========================
+class CaptureThread(QThread):
+    """Read and decode frames off the GUI thread into a frame buffer"""
+
+    def __init__(self, cap, fps=30, buffered=False, head=None, head_end=0, parent=None):
+        super().__init__(parent)
+        self.cap = cap
+        self.fps = fps if fps > 0 else 30
+        self.frames = FrameBuffer(2, buffered)
+        # First head_end decoded frames, kept across restarts
+        self.head = head if head is not None else []
+        self.head_end = head_end
+
+    def rewind(self):
+        """Seek to the start, returns cached frames to replay first"""
+        if self.head_end and len(self.head) == self.head_end:
+            # head_end is a keyframe, so decoding resumes without a long seek
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.head_end)
+            return self.head
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.head.clear()
+        return []
+
+    def next_frame(self, cached, decode=True):
+        """Next cached or decoded frame, None at the end of the video
+
+        With decode=False a frame past the head cache is only grabbed,
+        not converted, and True is returned in its place.
+        """
+        frame = next(cached, None)
+        if frame is not None:
+            return frame
+        if len(self.head) < self.head_end:
+            # Still filling the head cache, every frame is kept
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.head.append(frame)
+            return frame
+        if not decode:
+            return True if self.cap.grab() else None
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def run(self):
+        interval = 1.0 / self.fps
+        try:
+            cached = iter(self.rewind())
+            start = time.monotonic()
+            index = 0
+            while not self.isInterruptionRequested():
+                if self.frames.buffered:
+                    # Every frame is delivered, keep the clock in step for later
+                    start = time.monotonic() - index * interval
+                else:
+                    # Fell behind the wall clock, skip frames instead of lagging
+                    behind = int((time.monotonic() - start) * self.fps) - index
+                    while behind > 2 and self.next_frame(cached, decode=False) is not None:
+                        index += 1
+                        behind -= 1
+
+                frame = self.next_frame(cached)
+                if frame is None:
+                    break
+                index += 1
+                if not self.frames.put(frame):
+                    break
+
+                if not self.frames.buffered:
+                    # Pace decoding to the source frame rate
+                    delay = start + index * interval - time.monotonic()
+                    if delay > 0:
+                        self.msleep(int(delay * 1000))
+        finally:
+            self.frames.close()
+
+    def stop(self):
+        self.requestInterruption()
+        self.frames.close()
+        self.wait()
+
+
+# =========================
+# Process Thread
+# =========================
+class ProcessThread(QThread):
+    """Run the effect engine (and the video writer) on decoded frames"""
+
+    def __init__(self, source, engine, lock, buffered=False, parent=None):
+        super().__init__(parent)
+        self.source = source
+        # Swapped by the GUI thread while holding lock
+        self.engine = engine
+        self.writer = None
+        self.lock = lock
+        self.output = LatestSlot(3, buffered)
+
+    def run(self):
+        try:
+            while not self.isInterruptionRequested():
+                frame = self.source.get(50)
+                if frame is None:
+                    if self.source.is_drained():
+                        break
+                    continue
+
+                # The engine writes its result straight into the hand-off buffer
+                processed = self.output.acquire(frame.shape, frame.dtype)
+                if processed is None:
+                    break
+                with QMutexLocker(self.lock):
+                    self.engine.process(frame, out=processed)
+                    if self.writer is not None:
+                        self.writer.write(processed)
+
+                if not self.output.publish(processed):
+                    break
+        finally:
+            self.output.close()
+
+    def stop(self):
+        self.requestInterruption()
+        self.output.close()
+        self.wait()
+
+
+# =========================
+# CUDA Video Writer
+# =========================
+class CudaVideoWriter:
+    """cv2.VideoWriter-style wrapper around the NVENC cudacodec writer"""
+
+    def __init__(self, path, size, fps):
+        self.writer = cv2.cudacodec.createVideoWriter(
+            path, size, cv2.cudacodec.H264, fps
+        )
+        self.gpu_frame = cv2.cuda_GpuMat()
+
+    def isOpened(self):
+        return True
+
+    def write(self, frame):
+        self.gpu_frame.upload(frame)
+        self.writer.write(self.gpu_frame)
+
+    def release(self):
+        self.writer.release()
+
+
+# =========================
+# Writer Thread
+# =========================
+class WriterThread(QThread):
+    """Encode frames with a VideoWriter off the processing thread"""
+
+    def __init__(self, writer, queue_size=4, parent=None):
+        super().__init__(parent)
+        self.writer = writer
+        self.frames = queue.Queue(maxsize=queue_size)
+        # Frame copies go back here once encoded, so steady state allocates nothing
+        self.free = queue.Queue()
+
+    def write(self, frame):
+        """Queue a copy of frame, blocks only while the encoder is behind"""
+        try:
+            buf = self.free.get_nowait()
+        except queue.Empty:
+            buf = None
+        if buf is None or buf.shape != frame.shape:
+            buf = np.empty_like(frame)
+        np.copyto(buf, frame)
+        self.frames.put(buf)
+
+    def run(self):
+        while True:
+            buf = self.frames.get()
+            if buf is None:
+                break
+            self.writer.write(buf)
+            self.free.put(buf)
+
+    def stop(self):
+        """Flush the queued frames and close the file"""
+        self.frames.put(None)
+        self.wait()
+        self.writer.release()
+
+
+# =========================
+# Offline Pipeline
+# =========================
+def run_pipeline(node, cap, writer, prefetch=8):
+    """Decode, process and encode a whole video on three threads
+
+    node is anything with process(frame, out), e.g. a VisualEngine or a
+    single node, and only ever runs on the calling thread. At most
+    prefetch frames wait between each pair of stages. Returns the number
+    of frames written. An exception in any stage stops the others and is
+    raised here.
+    """
+    read_q = queue.Queue(maxsize=prefetch)
+    write_q = queue.Queue(maxsize=prefetch)
+    # Output frames go back here once encoded
+    free = queue.Queue()
+    # Set when a stage fails, the others give up at their next queue operation
+    failed = threading.Event()
+    errors = []
+
+    def put(q, item):
+        """q.put(), False once a stage has failed"""
+        while not failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(q):
+        """q.get(), None once a stage has failed"""
+        while not failed.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def read():
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret or not put(read_q, frame):
+                    break
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+        finally:
+            put(read_q, None)
+
+    def write():
+        try:
+            while True:
+                buf = get(write_q)
+                if buf is None:
+                    break
+                writer.write(buf)
+                free.put(buf)
+        except Exception as e:
+            errors.append(e)
+            failed.set()
+
+    reader = threading.Thread(target=read, daemon=True)
+    encoder = threading.Thread(target=write, daemon=True)
+    reader.start()
+    encoder.start()
+    count = 0
+    try:
+        while True:
+            frame = get(read_q)
+            if frame is None:
+                break
+            try:
+                buf = free.get_nowait()
+            except queue.Empty:
+                buf = np.empty_like(frame)
+            result = node.process(frame, out=buf)
+            if result is not buf:
+                np.copyto(buf, result)
+            if not put(write_q, buf):
+                break
+            count += 1
+        put(write_q, None)
+    except BaseException:
+        failed.set()
+        raise
+    finally:
+        encoder.join()
+        reader.join()
+    if errors:
+        raise errors[0]
+    return count